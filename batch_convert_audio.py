@@ -0,0 +1,140 @@
+"""Batch-convert a folder of WAV files to a single target codec.
+
+Companion to convert_audio.py for the common case where a scenario only
+negotiates one codec: pick the codec once and re-encode a whole prompt
+folder (keeping file names) instead of producing every variant.
+"""
+
+import argparse
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+from ffmpeg_util import run_ffmpeg
+
+# Resolved once at import so pool workers do not re-walk PATH per task.
+FFMPEG_BIN = shutil.which("ffmpeg")
+
+# ffmpeg options per codec, built once at import: codec -> (banner, options)
+_CODEC_OPTS = {
+    "pcma": ("G.711 A-law, 8 kHz mono", ["-ar", "8000", "-ac", "1", "-acodec", "pcm_alaw"]),
+    "pcmu": ("G.711 u-law, 8 kHz mono", ["-ar", "8000", "-ac", "1", "-acodec", "pcm_mulaw"]),
+    "g722": ("G.722 wideband, 16 kHz mono", ["-ar", "16000", "-ac", "1", "-acodec", "g722"]),
+    "ilbc": ("iLBC, 8 kHz mono", ["-ar", "8000", "-ac", "1", "-acodec", "ilbc"]),
+    "gsm": ("GSM full rate, 8 kHz mono", ["-ar", "8000", "-ac", "1", "-acodec", "libgsm"]),
+    "opus": ("Opus, 48 kHz mono", ["-ar", "48000", "-ac", "1", "-acodec", "libopus"]),
+}
+
+
+def check_ffmpeg():
+    """Check that ffmpeg is available on PATH.
+
+    Returns:
+        bool: True if ffmpeg was found
+    """
+    return FFMPEG_BIN is not None
+
+
+def convert_audio(input_file, output_file, codec, ffmpeg_threads=0, verbose=False):
+    """Convert one WAV file to the given codec.
+
+    Args:
+        input_file (str): Path to the source WAV file
+        output_file (str): Path for the converted file
+        codec (str): Target codec name (see _CODEC_OPTS)
+        ffmpeg_threads (int): Threads per ffmpeg process, 0 = auto
+        verbose (bool): Print a codec banner per conversion
+
+    Returns:
+        bool: True on success, False on failure
+    """
+    entry = _CODEC_OPTS.get(codec.lower())
+    if entry is None:
+        print(f"Unsupported codec: {codec}")
+        return False
+    banner, options = entry
+    if verbose:
+        print(f"[{codec}] {banner}")
+
+    threads = ["-threads", str(ffmpeg_threads)]
+    ffmpeg_cmd = [FFMPEG_BIN, "-y"] + threads + ["-i", input_file] + threads + options + [output_file]
+
+    if not run_ffmpeg(ffmpeg_cmd, input_file):
+        return False
+    print(f"Converted {input_file} -> {output_file}")
+    return True
+
+
+def _convert_one(task):
+    """Picklable worker: unpack one (input_file, output_file, codec, threads, verbose) task."""
+    input_file, output_file, codec, ffmpeg_threads, verbose = task
+    return convert_audio(input_file, output_file, codec, ffmpeg_threads, verbose)
+
+
+def batch_convert_folder(input_folder, output_folder, codec, workers=None, ffmpeg_threads=0,
+                         verbose=False):
+    """Convert every WAV in input_folder to codec, preserving file names.
+
+    Each conversion spawns its own ffmpeg process, so the tasks are
+    dispatched to a process pool and run up to `workers` at a time.
+
+    Args:
+        input_folder (str): Directory containing source WAV files
+        output_folder (str): Directory for converted files
+        codec (str): Target codec name
+        workers (int): Pool size, defaults to os.cpu_count()
+        ffmpeg_threads (int): Threads per ffmpeg process, 0 = auto
+        verbose (bool): Print a codec banner per conversion
+
+    Returns:
+        int: Number of successful conversions
+    """
+    if not check_ffmpeg():
+        print("ffmpeg not found on PATH - install it first (see README)")
+        return 0
+
+    wav_files = [
+        name for name in sorted(os.listdir(input_folder))
+        if name.lower().endswith(".wav")
+    ]
+    if not wav_files:
+        print(f"No WAV files found in {input_folder}")
+        return 0
+
+    os.makedirs(output_folder, exist_ok=True)
+
+    tasks = [
+        (os.path.join(input_folder, name), os.path.join(output_folder, name), codec,
+         ffmpeg_threads, verbose)
+        for name in wav_files
+    ]
+    print(f"Converting {len(tasks)} file(s) to {codec}")
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as ex:
+        results = list(ex.map(_convert_one, tasks))
+
+    success_count = sum(results)
+    print(f"Done: {success_count}/{len(tasks)} conversions succeeded")
+    return success_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch-convert WAV files to one SIPp codec")
+    parser.add_argument("input_folder", help="Directory containing source WAV files")
+    parser.add_argument("output_folder", help="Output directory")
+    parser.add_argument("--codec", default="pcma", help="Target codec (default: pcma)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Parallel ffmpeg processes (default: CPU count)")
+    parser.add_argument("--ffmpeg-threads", type=int, default=0,
+                        help="Threads per ffmpeg process, 0 = auto (keep workers * threads near CPU count)")
+    parser.add_argument("--verbose", action="store_true",
+                        help="Print a codec banner per conversion")
+    args = parser.parse_args()
+
+    batch_convert_folder(args.input_folder, args.output_folder, args.codec,
+                         workers=args.workers, ffmpeg_threads=args.ffmpeg_threads,
+                         verbose=args.verbose)
+
+
+if __name__ == "__main__":
+    main()
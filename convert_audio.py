@@ -0,0 +1,126 @@
+"""Convert WAV files into the codecs SIPp can stream over RTP.
+
+Each source WAV is rendered once per target codec (G.711 A-law/u-law,
+G.722, iLBC) so the same prompt can be used in scenarios negotiating
+different payload types. Requires ffmpeg on PATH.
+"""
+
+import argparse
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+from ffmpeg_util import run_ffmpeg
+
+# Resolved once at import so pool workers do not re-walk PATH per task.
+FFMPEG_BIN = shutil.which("ffmpeg")
+
+# Target formats for SIPp RTP streaming: codec key -> (suffix, sample rate, ffmpeg codec)
+CODECS = {
+    "alaw": ("_alaw.wav", "8000", "pcm_alaw"),
+    "ulaw": ("_ulaw.wav", "8000", "pcm_mulaw"),
+    "g722": (".g722", "16000", "g722"),
+    "ilbc": (".lbc", "8000", "ilbc"),
+}
+
+
+def convert_audio(input_file, output_folder, ffmpeg_threads=0):
+    """Convert one WAV file to every target codec with a single ffmpeg run.
+
+    ffmpeg supports multiple outputs per invocation, so the input is
+    decoded once and encoded to all codecs in one process instead of
+    re-decoding it per codec.
+
+    Args:
+        input_file (str): Path to the source WAV file
+        output_folder (str): Directory for the converted files
+        ffmpeg_threads (int): Threads per ffmpeg process, 0 = auto
+
+    Returns:
+        bool: True on success, False on failure
+    """
+    base_name = os.path.splitext(os.path.basename(input_file))[0]
+
+    ffmpeg_cmd = [
+        FFMPEG_BIN, "-y",
+        "-threads", str(ffmpeg_threads),
+        "-i", input_file,
+    ]
+    for suffix, sample_rate, ffmpeg_codec in CODECS.values():
+        ffmpeg_cmd += [
+            "-threads", str(ffmpeg_threads),
+            "-ac", "1",
+            "-ar", sample_rate,
+            "-acodec", ffmpeg_codec,
+            os.path.join(output_folder, base_name + suffix),
+        ]
+
+    if not run_ffmpeg(ffmpeg_cmd, input_file):
+        return False
+    print(f"Converted {input_file} -> {len(CODECS)} output(s) in {output_folder}")
+    return True
+
+
+def _convert_one(task):
+    """Picklable worker: unpack one (input_file, output_folder, threads) task."""
+    input_file, output_folder, ffmpeg_threads = task
+    return convert_audio(input_file, output_folder, ffmpeg_threads)
+
+
+def convert_directory(input_dir, output_dir, workers=None, ffmpeg_threads=0):
+    """Convert every WAV in input_dir to all target codecs.
+
+    Conversions are independent (one ffmpeg process per task), so they are
+    dispatched to a process pool and run up to `workers` at a time.
+
+    Args:
+        input_dir (str): Directory containing source WAV files
+        output_dir (str): Directory for converted files
+        workers (int): Pool size, defaults to os.cpu_count()
+        ffmpeg_threads (int): Threads per ffmpeg process, 0 = auto
+
+    Returns:
+        int: Number of successful conversions
+    """
+    if FFMPEG_BIN is None:
+        print("ffmpeg not found on PATH - install it first (see README)")
+        return 0
+
+    wav_files = [
+        os.path.join(input_dir, name)
+        for name in sorted(os.listdir(input_dir))
+        if name.lower().endswith(".wav")
+    ]
+    if not wav_files:
+        print(f"No WAV files found in {input_dir}")
+        return 0
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    tasks = [(wav, output_dir, ffmpeg_threads) for wav in wav_files]
+    print(f"Converting {len(wav_files)} file(s) to {len(CODECS)} codec(s) each")
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as ex:
+        results = list(ex.map(_convert_one, tasks))
+
+    success_count = sum(results)
+    print(f"Done: {success_count}/{len(tasks)} conversions succeeded")
+    return success_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert WAV files to SIPp-compatible codecs")
+    parser.add_argument("input_dir", help="Directory containing source WAV files")
+    parser.add_argument("output_dir", nargs="?", default="converted", help="Output directory (default: converted)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Parallel ffmpeg processes (default: CPU count)")
+    parser.add_argument("--ffmpeg-threads", type=int, default=0,
+                        help="Threads per ffmpeg process, 0 = auto (keep workers * threads near CPU count)")
+    args = parser.parse_args()
+
+    convert_directory(args.input_dir, args.output_dir, workers=args.workers,
+                      ffmpeg_threads=args.ffmpeg_threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""Shared ffmpeg invocation helper for the audio conversion scripts."""
+
+import subprocess
+
+
+def run_ffmpeg(ffmpeg_cmd, input_file):
+    """Run an ffmpeg command quietly, reporting stderr only on failure.
+
+    Success needs no output; only re-run with capture when it fails, so
+    the common case skips buffering and decoding ffmpeg's stderr.
+
+    Args:
+        ffmpeg_cmd (list): Full ffmpeg command line
+        input_file (str): Source file, for error messages
+
+    Returns:
+        bool: True on success, False on failure
+    """
+    try:
+        result = subprocess.run(ffmpeg_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if result.returncode != 0:
+            retry = subprocess.run(ffmpeg_cmd, capture_output=True, text=True, encoding="utf-8")
+            stderr = (retry.stderr or "").strip()
+            print(f"ffmpeg failed for {input_file}: {stderr.splitlines()[-1] if stderr else 'unknown error'}")
+            return False
+        return True
+    except OSError as e:
+        print(f"Could not run ffmpeg for {input_file}: {e}")
+        return False
@@ -1,95 +1,119 @@
+import asyncio
 import random
-import time
-import urllib.request
 import os
-import requests
+import aiofiles
+import httpx
 
 # Cấu hình API
 url = 'https://api.fpt.ai/hmi/tts/v5'
 API_KEY = ''  # Thay thế bằng API key của bạn
 
-def tts(name, voice, payload, output_dir='audio_output'):
+# Giới hạn số request đồng thời để tránh vượt rate limit của API
+CONCURRENCY = 10
+
+# Kích thước buffer khi tải file audio (1 MiB)
+DOWNLOAD_CHUNK = 1 << 20
+
+async def tts(client, sem, name, voice, payload_bytes, output_dir='audio_output'):
     """
     Chuyển đổi văn bản thành giọng nói bằng API FPT.AI
-    
+
     Args:
+        client (httpx.AsyncClient): Client HTTP dùng chung (HTTP/2)
+        sem (asyncio.Semaphore): Giới hạn số request đồng thời
         name (str): Tên file output
         voice (str): Loại giọng đọc
-        payload (str): Nội dung văn bản cần chuyển đổi
+        payload_bytes (bytes): Nội dung văn bản cần chuyển đổi (đã mã hóa UTF-8)
         output_dir (str): Thư mục lưu file audio
-    
+
     Returns:
         bool: True nếu thành công, False nếu thất bại
     """
-    # Tạo thư mục output nếu chưa tồn tại
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-    
-    # Chuẩn bị headers
+    # Chuẩn bị headers (api-key đặt sẵn trên client)
     headers = {
-        'api-key': API_KEY,
         'speed': str(round(random.uniform(0.8, 1.2), 1)),  # Tốc độ ngẫu nhiên từ 0.8-1.2
         'voice': voice,
         'format': 'wav'
     }
-    
+
     try:
-        # Gửi request đến API
-        response = requests.request('POST', url, data=payload.encode('utf-8'), headers=headers)
-        response.raise_for_status()  # Kiểm tra lỗi HTTP
-        
-        data_res = response.json()
-        
-        # Kiểm tra kết quả từ API
-        if not data_res or not isinstance(data_res, dict) or "async" not in data_res:
-            print(f"Lỗi khi xử lý '{name}': {data_res.get('message', 'Không có phản hồi hợp lệ')}")
-            return False
-        
-        audio_url = data_res['async']
-        if not audio_url.endswith('.wav'):
-            print(f"URL không hợp lệ cho '{name}': {audio_url}")
-            return False
-            
-        print(f"Đang xử lý '{name}' - URL: {audio_url}")
-        
-        # Thời gian chờ tỷ lệ với độ dài văn bản
-        wait_time = 2 + len(payload) * 0.05  # 2 giây cơ bản + thêm thời gian theo độ dài
-        print(f"Chờ {wait_time:.1f} giây để xử lý...")
-        time.sleep(wait_time)
-        
-        # Tải file âm thanh
-        output_path = os.path.join(output_dir, f'{name}.wav')
-        urllib.request.urlretrieve(audio_url, output_path)
-        print(f"Đã tạo file: {output_path}")
-        return True
-        
-    except requests.exceptions.RequestException as e:
+        async with sem:
+            # Gửi request đến API
+            response = await client.post(url, content=payload_bytes, headers=headers)
+            response.raise_for_status()  # Kiểm tra lỗi HTTP
+            data_res = response.json()
+
+            # Kiểm tra kết quả từ API
+            if not data_res or not isinstance(data_res, dict) or "async" not in data_res:
+                print(f"Lỗi khi xử lý '{name}': {data_res.get('message', 'Không có phản hồi hợp lệ')}")
+                return False
+
+            audio_url = data_res['async']
+            if not audio_url.endswith('.wav'):
+                print(f"URL không hợp lệ cho '{name}': {audio_url}")
+                return False
+
+            print(f"Đang xử lý '{name}' - URL: {audio_url}")
+
+            # Thăm dò URL với backoff thay vì chờ cố định; công thức cũ làm trần an toàn
+            max_wait = 2 + len(payload_bytes) * 0.05  # 2 giây cơ bản + thêm thời gian theo độ dài
+            waited = 0.0
+            delay = 0.2
+            while True:
+                await asyncio.sleep(delay)
+                waited += delay
+                head_resp = await client.head(audio_url)
+                if head_resp.status_code == 200:
+                    break
+                if waited >= max_wait:
+                    break
+                delay = min(delay * 2, max_wait - waited)
+
+            # Tải file âm thanh
+            output_path = os.path.join(output_dir, f'{name}.wav')
+            async with client.stream('GET', audio_url) as resp:
+                resp.raise_for_status()
+                # Ghi file không chặn event loop để request kế tiếp chạy song song
+                async with aiofiles.open(output_path, 'wb') as f:
+                    async for chunk in resp.aiter_bytes(DOWNLOAD_CHUNK):
+                        await f.write(chunk)
+            print(f"Đã tạo file: {output_path}")
+            return True
+
+    except httpx.HTTPError as e:
         print(f"Lỗi kết nối API cho '{name}': {e}")
         return False
-    except urllib.error.URLError as e:
-        print(f"Lỗi tải file cho '{name}': {e}")
-        return False
     except Exception as e:
         print(f"Lỗi không xác định khi xử lý '{name}': {e}")
         return False
 
-def batch_generate(category, phrases, voices):
+async def batch_generate(client, sem, category, phrases, voices, output_dir='audio_output'):
     """
-    Tạo file audio cho một danh sách các cụm từ
-    
+    Tạo file audio cho một danh sách các cụm từ (chạy đồng thời)
+
     Args:
+        client (httpx.AsyncClient): Client HTTP dùng chung (HTTP/2)
+        sem (asyncio.Semaphore): Giới hạn số request đồng thời
         category (str): Tên danh mục
         phrases (list): Danh sách các cụm từ
         voices (list): Danh sách giọng đọc
+        output_dir (str): Thư mục lưu file audio
     """
     print(f"\n--- Đang xử lý danh mục: {category} ({len(phrases)} cụm từ) ---")
-    success_count = 0
-    
-    for i, phrase in enumerate(phrases):
-        voice = random.choice(voices)
-        if tts(f'{category}_{i}', voice, phrase):
-            success_count += 1
-    
+
+    # Tạo thư mục output một lần thay vì kiểm tra trong từng lần gọi tts
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Mã hóa UTF-8 một lần cho mỗi cụm từ thay vì trong từng lần gọi tts
+    encoded = [phrase.encode('utf-8') for phrase in phrases]
+
+    tasks = [
+        tts(client, sem, f'{category}_{i}', random.choice(voices), payload_bytes, output_dir)
+        for i, payload_bytes in enumerate(encoded)
+    ]
+    results = await asyncio.gather(*tasks)
+    success_count = sum(results)
+
     print(f"Hoàn thành {category}: {success_count}/{len(phrases)} file")
 
 # Danh sách các cụm từ
@@ -135,16 +159,24 @@ voices = [
     "banmai", "thuminh", "myan", "giahuy", "ngoclam", "leminh", "minhquang", "linhsan", "lannhi"
 ]
 
-# Chạy chương trình chính
-if __name__ == "__main__":
+async def main():
     # Tạo thư mục output
     output_dir = "audio_files"
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
-    
-    # Xử lý từng danh mục
-    batch_generate("renewal", renewal, voices)
-    batch_generate("confirm", confirm, voices)
-    batch_generate("agent", agent, voices)
-    
+
+    sem = asyncio.Semaphore(CONCURRENCY)
+    # HTTP/2 cho phép ghép nhiều request trên ít kết nối, tái sử dụng phiên TLS
+    async with httpx.AsyncClient(http2=True,
+                                 limits=httpx.Limits(max_connections=32),
+                                 headers={'api-key': API_KEY}) as client:
+        # Xử lý từng danh mục
+        await batch_generate(client, sem, "renewal", renewal, voices)
+        await batch_generate(client, sem, "confirm", confirm, voices)
+        await batch_generate(client, sem, "agent", agent, voices)
+
     print("\nĐã hoàn thành tất cả các tác vụ!")
+
+# Chạy chương trình chính
+if __name__ == "__main__":
+    asyncio.run(main())
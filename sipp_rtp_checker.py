@@ -0,0 +1,231 @@
+"""Check how SIPp scenarios and launch scripts configure RTP ports.
+
+Scans a test tree for scenario XML files (SDP media ports, [media_port]
+and [auto_media_port] keywords), sipp command lines (-mp/-min_rtp_port/
+-max_rtp_port flags) and PCAP captures (actual RTP ports via tshark), so
+mismatches between the scenario and the firewall/SBC config show up
+before a load test fails halfway through.
+"""
+
+import argparse
+import mmap
+import os
+import re
+import shutil
+import subprocess
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Resolved once at import instead of probing tshark -v per capture.
+TSHARK_BIN = shutil.which("tshark")
+
+# Compiled once at import: these run against every scanned file.
+_SDP_RE = re.compile(r'm=audio\s+(\d+|(\[\w+\]))')
+_MP_RE = re.compile(rb'-mp\s+(\d+)')
+_MIN_RTP_RE = re.compile(rb'-min_rtp_port\s+(\d+)')
+_MAX_RTP_RE = re.compile(rb'-max_rtp_port\s+(\d+)')
+
+# Skip anything bigger than this when scanning for sipp command lines;
+# launch scripts are small, multi-GB logs are not worth grepping.
+_SCAN_SIZE_LIMIT = 16 << 20
+
+
+def extract_rtp_ports_from_xml(xml_file):
+    """Extract RTP port usage from one SIPp scenario file.
+
+    Args:
+        xml_file (str): Path to the scenario XML
+
+    Returns:
+        dict: static SDP ports, keyword usage flags and rtp_stream
+            actions, or None if the file cannot be parsed
+    """
+    result = {
+        'ports': set(),
+        'uses_media_port': False,
+        'uses_auto_media_port': False,
+        'rtp_streams': [],
+    }
+
+    try:
+        # Stream the document instead of materializing the full DOM:
+        # inspect each element as its end tag arrives, then drop it.
+        for _event, elem in ET.iterparse(xml_file, events=('end',)):
+            if elem.tag == 'send':
+                text = elem.text
+                if text:
+                    # Literal containment is a plain memory scan; only fall
+                    # through to the regexes when the keyword is present at
+                    # all (most <send> bodies carry no SDP).
+                    if 'm=audio' in text:
+                        for match in _SDP_RE.findall(text):
+                            port = match[0]
+                            if port.isdigit():
+                                result['ports'].add(int(port))
+                    if '[media_port]' in text:
+                        result['uses_media_port'] = True
+                    if '[auto_media_port]' in text:
+                        result['uses_auto_media_port'] = True
+            elif elem.tag == 'nop':
+                for action in elem.iter('exec'):
+                    rtp_stream = action.attrib.get('rtp_stream')
+                    if rtp_stream:
+                        result['rtp_streams'].append(rtp_stream)
+            else:
+                continue
+            elem.clear()
+    except ET.ParseError as e:
+        print(f"Could not parse {xml_file}: {e}")
+        return None
+
+    return result
+
+
+def check_sipp_commandline(directory):
+    """Scan scripts and logs in a directory for sipp RTP port flags.
+
+    Args:
+        directory (str): Directory to scan (non-recursive)
+
+    Returns:
+        dict: flag name -> port value for every flag found
+    """
+    flags = {}
+
+    # scandir caches stat info in the DirEntry, and mmap lets the regexes
+    # run over the file pages directly instead of a copied-in str.
+    with os.scandir(directory) as it:
+        for entry in it:
+            if not entry.is_file():
+                continue
+            if entry.name.lower().endswith(('.wav', '.pcap', '.pcapng', '.xml')):
+                continue
+            size = entry.stat().st_size
+            if size == 0 or size > _SCAN_SIZE_LIMIT:
+                continue
+            try:
+                with open(entry.path, 'rb') as f, \
+                        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if mm.find(b'sipp') < 0:
+                        continue
+                    for key, pattern in (('-mp', _MP_RE),
+                                         ('-min_rtp_port', _MIN_RTP_RE),
+                                         ('-max_rtp_port', _MAX_RTP_RE)):
+                        m = pattern.search(mm)
+                        if m:
+                            flags[key] = int(m.group(1))
+            except (OSError, ValueError):
+                continue
+
+    return flags
+
+
+def scan_pcap_for_rtp(pcap_file):
+    """List UDP ports carrying RTP in a capture, using tshark.
+
+    Args:
+        pcap_file (str): Path to the capture file
+
+    Returns:
+        set: UDP ports seen in RTP streams (empty if tshark unavailable)
+    """
+    ports = set()
+    if TSHARK_BIN is None:
+        print("tshark not found - skipping PCAP analysis")
+        return ports
+
+    result = subprocess.run(
+        [TSHARK_BIN, "-r", pcap_file, "-Y", "rtp", "-T", "fields",
+         "-e", "udp.srcport", "-e", "udp.dstport"],
+        capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"tshark failed on {pcap_file}")
+        return ports
+
+    for line in result.stdout.splitlines():
+        for field in line.split():
+            if field.isdigit():
+                ports.add(int(field))
+    return ports
+
+
+def _iter_files(root):
+    """Yield DirEntry objects for all files under root, depth first.
+
+    scandir keeps the file type from the directory read, so the walk
+    needs no extra stat calls the way os.walk does.
+    """
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_files(entry.path)
+            elif entry.is_file():
+                yield entry
+
+
+def analyze_directory(directory):
+    """Analyze a whole SIPp test tree and print an RTP port summary.
+
+    Args:
+        directory (str): Root of the test tree
+    """
+    xml_files = []
+    pcap_files = []
+    for entry in _iter_files(directory):
+        lower = entry.name.lower()
+        if lower.endswith('.xml'):
+            xml_files.append(entry.path)
+        elif lower.endswith(('.pcap', '.pcapng')):
+            pcap_files.append(entry.path)
+
+    print(f"Found {len(xml_files)} scenario file(s), {len(pcap_files)} capture(s)")
+
+    all_ports = set()
+    # Each file parses independently; fan out across cores and print the
+    # collected results afterwards so output order stays deterministic.
+    with ProcessPoolExecutor() as ex:
+        xml_results = list(ex.map(extract_rtp_ports_from_xml, xml_files))
+    for xml_file, info in zip(xml_files, xml_results):
+        if info is None:
+            continue
+        print(f"\n{xml_file}:")
+        if info['ports']:
+            print(f"  static SDP ports: {sorted(info['ports'])}")
+            all_ports.update(info['ports'])
+        if info['uses_media_port']:
+            print("  uses [media_port] (set with -mp)")
+        if info['uses_auto_media_port']:
+            print("  uses [auto_media_port] (set with -min_rtp_port/-max_rtp_port)")
+        if info['rtp_streams']:
+            print(f"  rtp_stream actions: {len(info['rtp_streams'])}")
+
+    flags = check_sipp_commandline(directory)
+    if flags:
+        print("\nsipp command line flags found:")
+        for key, value in sorted(flags.items()):
+            print(f"  {key} {value}")
+
+    if pcap_files:
+        # tshark releases the GIL while we wait on it, so threads suffice;
+        # one worker per capture up to the core count.
+        with ThreadPoolExecutor(max_workers=min(len(pcap_files), os.cpu_count() or 1)) as ex:
+            pcap_results = list(ex.map(scan_pcap_for_rtp, pcap_files))
+        for pcap_file, ports in zip(pcap_files, pcap_results):
+            if ports:
+                print(f"\n{pcap_file}: RTP on ports {sorted(ports)}")
+                all_ports.update(ports)
+
+    if all_ports:
+        print(f"\nAll RTP ports in use: {sorted(all_ports)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check RTP port configuration in a SIPp test tree")
+    parser.add_argument("directory", nargs="?", default=".", help="Test tree root (default: current directory)")
+    args = parser.parse_args()
+
+    analyze_directory(args.directory)
+
+
+if __name__ == "__main__":
+    main()